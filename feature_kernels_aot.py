@@ -0,0 +1,27 @@
+# =========================================================
+#  FEATURE KERNELS (Numba AOT)
+#  V8H-CORE | PMFX TRADING COMPANY
+#  build ครั้งเดียว: python feature_kernels_aot.py -> feature_kernels.*.so / .pyd
+#  ตัว kernel อยู่ใน feature_set_core.py (njit) -> ที่นี่ export py_func ตัวเดียวกัน
+# =========================================================
+
+from numba.pycc import CC
+
+from feature_set_core import atr_numba, ema_numba, label_numba, lwma_numba, triple_ema
+
+cc = CC("feature_kernels")
+
+# EMA (adjust=False)
+cc.export("ema", "f8[:](f8[:], i8)")(ema_numba.py_func)
+# EMA 20/50/200 ใน pass เดียว -> (3, N)
+cc.export("triple_ema", "f8[:, ::1](f8[:], f8, f8, f8)")(triple_ema.py_func)
+# LWMA (weights 1..period)
+cc.export("lwma", "f8[:](f8[:], i8)")(lwma_numba.py_func)
+# ATR (True Range -> rolling mean)
+cc.export("atr", "f8[:](f8[:], f8[:], f8[:], i8)")(atr_numba.py_func)
+# Label (1 = ขึ้นเกิน threshold, NaN = noise, 0 = อื่นๆ)
+cc.export("label", "f4[:](f8[:], f8[:], i8)")(label_numba.py_func)
+
+
+if __name__ == "__main__":
+    cc.compile()
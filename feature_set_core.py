@@ -5,6 +5,259 @@
 
 import pandas as pd
 import numpy as np
+from numba import njit, types
+
+# AOT build: python feature_kernels_aot.py (.so / .pyd อยู่ข้างไฟล์นี้)
+# import แบบ package ก่อน (training_pipeline ใช้ relative import) แล้วค่อยแบบ script
+try:
+    from . import feature_kernels
+except ImportError:
+    try:
+        import feature_kernels
+    except ImportError:
+        feature_kernels = None  # ใช้ JIT / pandas แทน
+KERNEL_BACKEND = "aot" if feature_kernels is not None else "jit"
+
+
+# -------------------------------
+# Numba kernels
+# -------------------------------
+# pandas (copy-on-write) คืน ndarray แบบ read-only -> ต้อง register ทั้งสองแบบ
+F8_1D = types.float64[::1]
+F8_1D_RO = types.Array(types.float64, 1, "C", readonly=True)
+F8_2D = types.float64[:, ::1]
+
+
+@njit(cache=True)
+def ema_step(prev, w, x, alpha):
+    # 1 แถวของ ewm(adjust=False): w = น้ำหนักของ prev (เริ่ม 1.0, คูณ 1 - alpha ทุกแถว)
+    # x เป็น NaN -> คง prev แต่ w ยังลดต่อ -> ค่าถัดไปถ่วงแบบ pandas (ignore_na=False)
+    # ไม่ใช้ fastmath เพราะต้องเช็ค NaN
+    w *= 1.0 - alpha
+    if np.isnan(x):
+        return prev, w
+    if np.isnan(prev):
+        return x, 1.0  # ค่าแรกที่ไม่ใช่ NaN = ค่าเริ่มต้น
+    if w == 1.0 - alpha:
+        return prev + alpha * (x - prev), 1.0  # ไม่มีช่วง NaN
+    # หลังช่วง NaN: pandas ใช้ (w * prev + a * x) / (w + a), a = 1 - w เมื่อ com == 1
+    a = 1.0 - w if alpha == 0.5 else alpha
+    return (w * prev + a * x) / (w + a), 1.0
+
+
+@njit(cache=True)
+def _fmax(a, b):
+    # max ที่ข้าม NaN เหมือน DataFrame.max(axis=1) (np.fmax บน scalar ช้ามากใน numba)
+    if a >= b or np.isnan(b):
+        return a
+    return b
+
+
+@njit(cache=True)
+def _tr_at(high, low, close, i):
+    # i >= 1 (แถวแรก TR = high - low, คำนวณแยกนอก loop -> loop ไม่มี branch, เร็วกว่ามาก)
+    t = _fmax(high[i] - low[i], abs(high[i] - close[i - 1]))
+    return _fmax(t, abs(low[i] - close[i - 1]))
+
+
+@njit(cache=True)
+def _lwma_slide(x, p, out):
+    # wsum_i = wsum_(i-1) - sum_(i-1) + p * x_i, sum = ผลรวมธรรมดาใน window
+    # NaN นับแยก (ใน sum ใช้ 0) -> window ที่มี NaN ได้ NaN เหมือน rolling
+    n = x.shape[0]
+    denom = p * (p + 1) / 2
+    wsum = 0.0
+    psum = 0.0
+    nans = 0
+    for i in range(n):
+        xi = x[i]
+        if np.isnan(xi):
+            nans += 1
+            xi = 0.0
+        wsum += p * xi - psum
+        psum += xi
+        if i >= p:
+            old = x[i - p]
+            if np.isnan(old):
+                nans -= 1
+            else:
+                psum -= old
+        if i & 4095 == 0 and i >= p - 1:
+            # คำนวณ sum ใหม่ทุก 4096 แถว กัน floating error สะสมจากการบวก/ลบต่อเนื่อง
+            wsum = 0.0
+            psum = 0.0
+            for k in range(p):
+                v = x[i - p + 1 + k]
+                if not np.isnan(v):
+                    wsum += (k + 1) * v
+                    psum += v
+        if i < p - 1 or nans > 0:
+            out[i] = np.nan
+        else:
+            out[i] = wsum / denom
+
+
+@njit(cache=True)
+def _atr_slide(high, low, close, p, out):
+    # rolling mean ของ TR ด้วย sliding sum (เก็บ TR ไว้ลบตอนออกจาก window)
+    n = close.shape[0]
+    tr = np.empty(n)
+    if n > 0:
+        tr[0] = high[0] - low[0]
+    for i in range(1, n):
+        tr[i] = _tr_at(high, low, close, i)
+    tr_sum = 0.0
+    nans = 0
+    for i in range(n):
+        t = tr[i]
+        if np.isnan(t):
+            nans += 1
+        else:
+            tr_sum += t
+        if i >= p:
+            if np.isnan(tr[i - p]):
+                nans -= 1
+            else:
+                tr_sum -= tr[i - p]
+        if i < p - 1 or nans > 0:
+            out[i] = np.nan
+        else:
+            out[i] = tr_sum / p
+
+
+# kernel หลัก: เขียนครั้งเดียวตรงนี้ -> feature_kernels_aot.py export py_func ตัวเดียวกัน
+@njit(
+    [F8_1D(F8_1D, types.int64), F8_1D(F8_1D_RO, types.int64)],
+    cache=True,
+)
+def ema_numba(x, period):
+    # EMA (adjust=False)
+    n = x.shape[0]
+    out = np.empty(n)
+    alpha = 2.0 / (period + 1)
+    e = np.nan
+    w = 1.0
+    for i in range(n):
+        e, w = ema_step(e, w, x[i], alpha)
+        out[i] = e
+    return out
+
+
+@njit(
+    [F8_1D(F8_1D, types.int64), F8_1D(F8_1D_RO, types.int64)],
+    cache=True,
+)
+def lwma_numba(x, period):
+    # LWMA (weights 1..period)
+    out = np.empty(x.shape[0])
+    _lwma_slide(x, period, out)
+    return out
+
+
+@njit(cache=True)
+def atr_numba(high, low, close, period):
+    # ATR (True Range -> rolling mean)
+    out = np.empty(close.shape[0])
+    _atr_slide(high, low, close, period, out)
+    return out
+
+
+@njit(cache=True)
+def label_numba(close, atr_14, lookahead):
+    # 1 = ขึ้นเกิน threshold, NaN = noise, 0 = อื่นๆ (รวม lookahead แถวท้าย)
+    n = close.shape[0]
+    out = np.zeros(n, dtype=np.float32)
+    for i in range(n - lookahead):
+        diff = close[i + lookahead] - close[i]
+        threshold = atr_14[i] * 0.3
+        if abs(diff) <= threshold:
+            out[i] = np.nan
+        elif diff > threshold:
+            out[i] = 1.0
+    return out
+
+
+@njit(
+    [F8_1D(F8_1D, types.int64), F8_1D(F8_1D_RO, types.int64)],
+    cache=True,
+)
+def roll_pct_std(c, w):
+    # = c.pct_change().rolling(w).std() ใน pass เดียว (rolling Welford: เพิ่ม/ลบทีละตัว)
+    # ไม่ใช้ fastmath เพราะต้องเช็ค NaN
+    n = c.shape[0]
+    out = np.full(n, np.nan)
+    mean = 0.0
+    m2 = 0.0
+    valid = 0  # ค่า non-NaN ใน window
+    for i in range(1, n):
+        r = c[i] / c[i - 1] - 1.0
+        if not np.isnan(r):
+            valid += 1
+            d = r - mean
+            mean += d / valid
+            m2 += d * (r - mean)
+        j = i - w
+        if j >= 1:
+            r_old = c[j] / c[j - 1] - 1.0
+            if not np.isnan(r_old):
+                valid -= 1
+                if valid == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    d = r_old - mean
+                    mean -= d / valid
+                    m2 -= d * (r_old - mean)
+        if valid == w and w > 1:
+            out[i] = np.sqrt(max(m2, 0.0) / (w - 1))
+    return out
+
+
+@njit(
+    [
+        F8_2D(F8_1D, types.float64, types.float64, types.float64),
+        F8_2D(F8_1D_RO, types.float64, types.float64, types.float64),
+    ],
+    cache=True,
+)
+def triple_ema(x, a20, a50, a200):
+    # EMA 3 ตัว (adjust=False) ใน loop เดียว -> อ่าน close รอบเดียว
+    # o = (3, N): แต่ละ EMA เป็นแถวที่ contiguous
+    n = x.shape[0]
+    o = np.empty((3, n))
+    e20 = e50 = e200 = np.nan
+    w20 = w50 = w200 = 1.0
+    for i in range(n):
+        xi = x[i]
+        e20, w20 = ema_step(e20, w20, xi, a20)
+        e50, w50 = ema_step(e50, w50, xi, a50)
+        e200, w200 = ema_step(e200, w200, xi, a200)
+        o[0, i] = e20
+        o[1, i] = e50
+        o[2, i] = e200
+    return o
+
+
+EMA_COLS = ["ema_20", "ema_50", "ema_200"]
+# คอลัมน์ที่ lwma_atr คืนค่า (ตามลำดับ)
+TREND_COLS = ["lwma_7", "lwma_20", "lwma_60", "atr_14"]
+# NaN ช่วงต้นของ indicator: lwma_60 = 59, volatility (pct_change + rolling 20) = 20,
+# atr_14 = 13, trend_slope = 5 -> ตัดแถวแรกเท่าตัวที่ยาวที่สุด
+WARMUP_ROWS = max(60 - 1, 20, 14 - 1, 5)
+# คอลัมน์ที่ create_multi_label อ่าน (NaN ใน label มาจากคอลัมน์เหล่านี้เท่านั้น)
+LABEL_INPUT_COLS = ["close", "zone", "atr_14"]
+
+
+@njit(cache=True)
+def lwma_atr(close, high, low):
+    # LWMA 7/20/60 + ATR 14, O(1) ต่อแถว (ไม่ใช้ fastmath เพราะต้องเช็ค NaN)
+    # out = (4, N): แต่ละคอลัมน์เป็นแถวที่ contiguous
+    out = np.empty((4, close.shape[0]))
+    _lwma_slide(close, 7, out[0])
+    _lwma_slide(close, 20, out[1])
+    _lwma_slide(close, 60, out[2])
+    _atr_slide(high, low, close, 14, out[3])
+    return out
 
 
 class FeatureSetCore:
@@ -16,40 +269,60 @@ class FeatureSetCore:
     # Basic indicators
     # -------------------------------
     def ema(self, series, period):
-        return series.ewm(span=period, adjust=False).mean()
+        # = series.ewm(span=period, adjust=False).mean() รวมการถ่วงช่วง NaN
+        x = np.ascontiguousarray(series.to_numpy(dtype=np.float64))
+        if feature_kernels is not None:
+            out = feature_kernels.ema(x, period)
+        else:
+            out = ema_numba(x, period)
+        return pd.Series(out, index=series.index)
 
     def lwma(self, series, period):
-        weights = np.arange(1, period + 1)
-        return series.rolling(period).apply(
-            lambda x: np.dot(x, weights) / weights.sum(), raw=True
-        )
+        # kernel รับเฉพาะ C-contiguous (เช่น df.iloc[::2] ต้อง copy ก่อน)
+        x = np.ascontiguousarray(series.to_numpy(dtype=np.float64))
+        if feature_kernels is not None:
+            out = feature_kernels.lwma(x, period)
+        else:
+            out = lwma_numba(x, period)
+        return pd.Series(out, index=series.index)
 
     def atr(self, df, period=14):
-        high_low = df["high"] - df["low"]
-        high_close = (df["high"] - df["close"].shift()).abs()
-        low_close = (df["low"] - df["close"].shift()).abs()
-        tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-        return tr.rolling(period).mean()
+        high = df["high"].to_numpy(dtype=np.float64)
+        low = df["low"].to_numpy(dtype=np.float64)
+        close = df["close"].to_numpy(dtype=np.float64)
+        if feature_kernels is not None:
+            out = feature_kernels.atr(high, low, close, period)
+        else:
+            out = atr_numba(high, low, close, period)
+        return pd.Series(out, index=df.index)
 
     # -------------------------------
     # Trend Features
+    # NOTE: add_* / create_* เขียนคอลัมน์ลง df ที่ส่งเข้ามาโดยตรง (ไม่ copy)
     # -------------------------------
     def add_trend_features(self, df):
-        df = df.copy()
-        # EMA
-        df["ema_20"] = self.ema(df["close"], 20)
-        df["ema_50"] = self.ema(df["close"], 50)
-        df["ema_200"] = self.ema(df["close"], 200)
-        # LWMA
-        df["lwma_7"] = self.lwma(df["close"], 7)
-        df["lwma_20"] = self.lwma(df["close"], 20)
-        df["lwma_60"] = self.lwma(df["close"], 60)
-        # ATR
-        df["atr_14"] = self.atr(df, 14)
+        close = np.ascontiguousarray(df["close"].to_numpy(dtype=np.float64))
+        # EMA 20/50/200 ใน pass เดียว (AOT ถ้ามี, ไม่งั้น JIT)
+        if feature_kernels is not None:
+            emas = feature_kernels.triple_ema(close, 2 / 21, 2 / 51, 2 / 201)
+        else:
+            emas = triple_ema(close, 2 / 21, 2 / 51, 2 / 201)
+        for col, values in zip(EMA_COLS, emas):
+            df[col] = values
+        # LWMA 7/20/60, ATR 14 (AOT ถ้ามี, ไม่งั้น JIT pass เดียว)
+        if feature_kernels is not None:
+            for period in (7, 20, 60):
+                df[f"lwma_{period}"] = self.lwma(df["close"], period)
+            df["atr_14"] = self.atr(df, 14)
+        else:
+            high = df["high"].to_numpy(dtype=np.float64)
+            low = df["low"].to_numpy(dtype=np.float64)
+            for col, values in zip(TREND_COLS, lwma_atr(close, high, low)):
+                df[col] = values
         # Trend slope
         df["trend_slope"] = df["close"].diff(5)
         # Above EMA200
-        df["above_ema200"] = (df["close"] > df["ema_200"]).astype(int)
+        df["above_ema200"] = (df["close"] > df["ema_200"]).astype(np.int8)
 
         return df
 
@@ -57,10 +330,12 @@ class FeatureSetCore:
     # Zone Features (BIG PRICE ZONES)
     # -------------------------------
     def add_zone_features(self, df, zone_step=50):
-        df = df.copy()
-        df["zone"] = (df["close"] // zone_step) * zone_step
-        df["distance_from_zone"] = df["close"] - df["zone"]
-        df["near_zone"] = (df["distance_from_zone"].abs() < 10).astype(int)
+        # df.eval ใช้ numexpr อัตโนมัติถ้าติดตั้งไว้
+        df.eval("zone = (close // @zone_step) * @zone_step", inplace=True)
+        df.eval("distance_from_zone = close - zone", inplace=True)
+        df["near_zone"] = (
+            np.abs(df["distance_from_zone"].to_numpy()) < 10
+        ).view(np.int8)
 
         return df
 
@@ -68,9 +343,9 @@ class FeatureSetCore:
     # Volatility & Risk Features
     # -------------------------------
     def add_vol_risk_features(self, df):
-        df = df.copy()
         # Rolling volatility (20 periods)
-        df["volatility"] = df["close"].pct_change().rolling(20).std()
+        close = np.ascontiguousarray(df["close"].to_numpy(dtype=np.float64))
+        df["volatility"] = roll_pct_std(close, 20)
         # Volume MA
         if "volume" in df.columns:
             df["volume_ma"] = self.ema(df["volume"], 20)
@@ -82,149 +357,148 @@ class FeatureSetCore:
     # Create Label for ML
     # -------------------------------
     def create_label(self, df, lookahead=5):
-        df = df.copy()
-        future_close = df["close"].shift(-lookahead)
-        threshold = df["atr_14"] * 0.3
-        df["y"] = (future_close - df["close"] > threshold).astype(int)
-        df.loc[(df["close"] - future_close > threshold), "y"] = 0
-        noise_mask = (future_close - df["close"]).abs() <= threshold
-        df.loc[noise_mask, "y"] = None
-
+        close = df["close"].to_numpy(dtype=np.float64)
+        atr_14 = df["atr_14"].to_numpy(dtype=np.float64)
+        if feature_kernels is not None:
+            df["y"] = feature_kernels.label(close, atr_14, lookahead)
+        else:
+            df["y"] = label_numba(close, atr_14, lookahead)
         return df
 
     def create_multi_label(self, df, lookahead=5):
-        df = df.copy()
         # y_trend
-        df["y_trend"] = (df["close"].shift(-lookahead) > df["close"]).astype(int)
+        df["y_trend"] = (df["close"].shift(-lookahead) > df["close"]).astype(np.int8)
         # y_zone
         future_distance = (df["close"].shift(-lookahead) - df["zone"]).abs()
-        df["y_zone"] = (future_distance < 10).astype(int)
+        df["y_zone"] = (future_distance < 10).astype(np.int8)
         # y_risk
-        df["y_risk"] = (df["atr_14"].shift(-lookahead) > df["atr_14"]).astype(int)
-        return df.dropna()
+        df["y_risk"] = (df["atr_14"].shift(-lookahead) > df["atr_14"]).astype(np.int8)
+        # ตัด lookahead แถวท้าย (ไม่มี future -> label ไม่จริง)
+        df = df.iloc[: max(len(df) - lookahead, 0)]
+        # label อ่านแค่ close / zone / atr_14 -> เช็ค NaN เฉพาะ 3 คอลัมน์นี้
+        # (input ไม่ได้มาจาก build_features) -> fallback dropna
+        if df[LABEL_INPUT_COLS].isna().to_numpy().any():
+            df = df.dropna()
+        return df
 
     # -------------------------------
     # Final Combined Feature Set
     # -------------------------------
-    def build_features(self, df):
-        df = df.copy()
+    def build_features(self, df_in):
+        """copy df_in ครั้งเดียว แล้ว add_* ทุกตัวเขียนลง frame เดียวกัน (df_in ไม่ถูกแก้)"""
+        # NaN กลาง series มาจาก df_in เท่านั้น -> เช็คคอลัมน์ input ครั้งเดียว (ไม่สแกน feature)
+        has_nan = df_in.isna().to_numpy().any()
+        df = df_in.copy()
         df = self.add_trend_features(df)
         df = self.add_zone_features(df)
         df = self.add_vol_risk_features(df)
         # Remove NaN indicators
-        df = df.dropna()
-        return df
+        if has_nan:
+            return df.dropna()  # raw data มี NaN -> ไม่ให้ NaN หลุดไปถึง training
+        return df.iloc[WARMUP_ROWS:]  # NaN อยู่แค่ช่วง warmup -> slice แทน dropna
 
 
 class FeatureSetCoreRealtime:
     def __init__(self, window=200):
         self.window = window
-        self.buffer = []
+        # ring buffer (one array per column) -> update() ไม่ต้อง allocate ใหม่ทุก tick
+        self.open = np.empty(window, dtype=np.float64)
+        self.high = np.empty(window, dtype=np.float64)
+        self.low = np.empty(window, dtype=np.float64)
+        self.close = np.empty(window, dtype=np.float64)
+        self.volume = np.empty(window, dtype=np.float64)
+        self.idx = 0  # next write position
+        self.count = 0  # filled slots (<= window)
+        # EMA state (update ทีละ tick, O(1))
+        self.alpha20 = 2.0 / (20 + 1)
+        self.alpha50 = 2.0 / (50 + 1)
+        self.alpha200 = 2.0 / (200 + 1)
+        self.ema20 = self.ema50 = self.ema200 = np.nan
+        self.w20 = self.w50 = self.w200 = 1.0  # น้ำหนัก state ของ ema_step
+        # LWMA weights (normalized, สร้างครั้งเดียว)
+        self._lwma_w = {
+            p: np.arange(1, p + 1, dtype=np.float64) / (p * (p + 1) / 2)
+            for p in (7, 20, 60)
+        }
 
     def update(self, tick: dict):
         # tick = {"bid":...,"ask":...,"volume":...}
         price = (tick["bid"] + tick["ask"]) / 2
-        vol = tick.get("volume", 0)
-        self.buffer.append(
-            {
-                "open": tick.get("open", "price"),
-                "high": tick.get("high", "price"),
-                "low": tick.get("low", "price"),
-                "close": price,
-                "volume": vol,
-            }
+        i = self.idx
+        self.open[i] = tick.get("open", price)
+        self.high[i] = tick.get("high", price)
+        self.low[i] = tick.get("low", price)
+        self.close[i] = price
+        self.volume[i] = tick.get("volume", 0)
+        self.ema20, self.w20 = ema_step(self.ema20, self.w20, price, self.alpha20)
+        self.ema50, self.w50 = ema_step(self.ema50, self.w50, price, self.alpha50)
+        self.ema200, self.w200 = ema_step(
+            self.ema200, self.w200, price, self.alpha200
         )
         # collect last window
-        if len(self.buffer) > self.window:
-            self.buffer.pop(0)
+        self.idx = (i + 1) % self.window
+        if self.count < self.window:
+            self.count += 1
+
+    def _tail(self, arr, n):
+        # last n values (oldest..newest) จาก ring buffer, เป็น view ถ้าไม่ wrap
+        i = self.idx
+        if i >= n:
+            return arr[i - n : i]
+        return np.concatenate((arr[i - n :], arr[:i]))
 
     def to_numpy(self):
-        if len(self.buffer) < 200:
+        if self.count < 200:
             return None  # wait for buffer 50 candle
-        df = pd.DataFrame(self.buffer)
-        # use feature
-        # EMA
-        df["ema_20"] = df["close"].ewm(span=20).mean()
-        df["ema_50"] = df["close"].ewm(span=50).mean()
-        df["ema_200"] = df["close"].ewm(span=200).mean()
-
+        last = (self.idx - 1) % self.window
+        close = self.close[last]
+        closes = self._tail(self.close, 61)
         # LWMA
-        def lwma(series, period):
-            weights = np.arange(1, period + 1)
-            return series.rolling(period).apply(
-                lambda x: np.dot(x, weights) / weights.sum(), raw=True
-            )
-
-        df["lwma_7"] = lwma(df["close"], 7)
-        df["lwma_20"] = lwma(df["close"], 20)
-        df["lwma_60"] = lwma(df["close"], 60)
-        # ATR
-        df["high"] = df["close"]
-        df["low"] = df["close"]
-        df["close_shift"] = df["close"].shift()
-        tr = pd.concat(
-            [
-                (df["high"] - df["low"]),
-                (df["high"] - df["close_shift"]).abs(),
-                (df["low"] - df["close_shift"]).abs(),
-            ],
-            axis=1,
-        ).max(axis=1)
-        df["atr_14"] = tr.rolling(14).mean()
+        lwma_7 = closes[-7:] @ self._lwma_w[7]
+        lwma_20 = closes[-20:] @ self._lwma_w[20]
+        lwma_60 = closes[-60:] @ self._lwma_w[60]
+        # ATR (realtime ใช้ high = low = close -> TR = |close - prev close|)
+        atr_14 = np.abs(np.diff(closes[-15:])).mean()
         # Trend slope
-        df["trend_slope"] = df["close"].diff(5)
-        # Above EMA200
-        df["above_ema200"] = (df["close"] > df["ema_200"]).astype(int)
-        # ==========
+        trend_slope = close - closes[-6]
         # Zone Features
+        zone = (close // 50) * 50
+        distance_from_zone = close - zone
         # ==========
-        df["zone"] = (df["close"] // 50) * 50
-        df["distance_from_zone"] = df["close"] - df["zone"]
-        df["near_zone"] = (df["distance_from_zone"].abs() < 10).astype(int)
-        # ==========
-        # Volatility & Risk
-        # ==========
-        df["volatility"] = df["close"].pct_change().rolling(20).std()
-        df["volume_ma"] = df["volume"].ewm(span=20).mean()
-        # ==========
-        # CLEAN
+        # Feature columns ตาม TRAINING
         # ==========
-        df = df.dropna()
-        # Deugging Logger :
-        print("Length of Dataframe after dropna :", len(df))
-        print("Data after dropna tail:", df.tail())
-
+        row = np.array(
+            [
+                [
+                    # core OHLCV
+                    self.open[last],
+                    close,
+                    close,
+                    close,
+                    self.volume[last],
+                    # --- Trend / MA Features ---
+                    self.ema20,
+                    self.ema50,
+                    self.ema200,
+                    lwma_7,
+                    lwma_20,
+                    lwma_60,
+                    # --- Votility ---
+                    atr_14,
+                    # --- Trend slope ---
+                    trend_slope,
+                    # --- Above EMA 200 (binary) ---
+                    close > self.ema200,
+                    # --- Zone Features ---
+                    zone,
+                    distance_from_zone,
+                    abs(distance_from_zone) < 10,
+                ]
+            ],
+            dtype=np.float32,
+        )
         # ถ้าฟีเจอร์ไม่ครบ ยังไม่พร้อม
-        if len(df) == 0:
+        if np.isnan(row).any():
             return None
-        # ==========
-        # Feature columns ตาม TRAINING
-        # ==========
-        feature_cols = [
-            # core OHLCV
-            "open",
-            "high",
-            "low",
-            "close",
-            "volume",
-            # --- Trend / MA Features ---
-            "ema_20",
-            "ema_50",
-            "ema_200",
-            "lwma_7",
-            "lwma_20",
-            "lwma_60",
-            # --- Votility ---
-            "atr_14",
-            # --- Trend slope ---
-            "trend_slope",
-            # --- Above EMA 200 (binary) ---
-            "above_ema200",
-            # --- Zone Features ---
-            "zone",
-            "distance_from_zone",
-            "near_zone",
-        ]
-        row = df.iloc[-1:][feature_cols].values.astype(np.float32)
-        # reshape → (1, features)
-        return row.astype(np.float32).reshape(1, -1)
+        # shape → (1, features)
+        return row
@@ -5,7 +5,9 @@
 
 import os
 import warnings
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import matplotlib.pyplot as plt
 
 from backtest_engine import BacktestEngine
@@ -23,16 +25,28 @@ DATA_PATH = r"C:\Users\CIT\Documents\MT5_AI\V8H-CORE\data\clean"
 SYMBOL = "GOLD#"
 INITIAL_BALANCE = 1000.0
 TIMEFRAME = "M15"   # M1 | M5 | M15
+# คอลัมน์ที่อ่าน (เฉพาะที่มีในไฟล์) -> volume เป็น optional, time เก็บไว้ให้ engine
+DATA_COLUMNS = ["time", "open", "high", "low", "close", "volume"]
+# time เป็น str ทั้ง CSV / parquet (pyarrow CSV engine จะ parse เป็น datetime เองถ้าไม่ระบุ)
+COLUMN_DTYPES = {
+    "time": "str",
+    "open": "float32",
+    "high": "float32",
+    "low": "float32",
+    "close": "float32",
+    "volume": "float32",
+}
 
 # ------------------------------------------------------
 # DATA LOADER
 # ------------------------------------------------------
 def load_data(tf: str) -> pd.DataFrame:
+    # parquet ก่อน (columnar, อ่านเฉพาะคอลัมน์ที่ใช้) แล้วค่อย fallback เป็น CSV
     candidates = [
-        f"{tf}.csv",
-        f"GOLD_{tf}.csv",
         f"{tf}.parquet",
         f"GOLD_{tf}.parquet",
+        f"{tf}.csv",
+        f"GOLD_{tf}.csv",
     ]
 
     for file in candidates:
@@ -40,8 +54,15 @@ def load_data(tf: str) -> pd.DataFrame:
         if os.path.exists(path):
             print(f"[OK] Loading data: {file}")
             if file.endswith(".csv"):
-                return pd.read_csv(path)
-            return pd.read_parquet(path)
+                available = pd.read_csv(path, nrows=0).columns
+            else:
+                available = pq.read_schema(path).names
+            columns = [col for col in DATA_COLUMNS if col in available]
+            dtypes = {col: COLUMN_DTYPES[col] for col in columns}
+            if file.endswith(".csv"):
+                return pd.read_csv(path, usecols=columns, dtype=dtypes, engine="pyarrow")
+            df = pd.read_parquet(path, engine="pyarrow", columns=columns)
+            return df.astype(dtypes)
 
     raise FileNotFoundError(f"No data found for timeframe {tf}")
 
@@ -49,44 +70,42 @@ def load_data(tf: str) -> pd.DataFrame:
 # ADVANCED REPORT
 # ------------------------------------------------------
 def generate_advanced_report(history: pd.DataFrame, initial_balance: float):
-    closes = history[history.event == "close"].copy()
-    if closes.empty:
+    # กรอง close ครั้งเดียว แล้วคำนวณบน ndarray ทั้งหมด
+    closes = history.loc[history["event"] == "close", ["pnl", "dd"]].to_numpy(
+        dtype=np.float64
+    )
+    if len(closes) == 0:
         print("[WARN] No closed trades")
         return
 
-    pnl = closes.pnl
+    pnl, dd = closes.T
 
-    gross_profit = pnl[pnl > 0].sum()
-    gross_loss = pnl[pnl < 0].sum()
-    net_profit = gross_profit + gross_loss
+    win_pnl = pnl[pnl > 0]
+    loss_pnl = pnl[pnl < 0]
 
-    win_trades = closes[pnl > 0]
-    loss_trades = closes[pnl < 0]
+    gross_profit = win_pnl.sum()
+    gross_loss = loss_pnl.sum()
+    net_profit = gross_profit + gross_loss
 
     profit_factor = abs(gross_profit / gross_loss) if gross_loss != 0 else float("inf")
     expectancy = pnl.mean()
 
-    avg_win = win_trades.pnl.mean() if not win_trades.empty else 0
-    avg_loss = loss_trades.pnl.mean() if not loss_trades.empty else 0
+    avg_win = win_pnl.mean() if win_pnl.size else 0
+    avg_loss = loss_pnl.mean() if loss_pnl.size else 0
 
     max_win = pnl.max()
     max_loss = pnl.min()
 
-    max_dd = closes.dd.max()
+    max_dd = dd.max()
     recovery_factor = (
         net_profit / (initial_balance * max_dd / 100)
         if max_dd > 0 else float("inf")
     )
 
-    # Consecutive Loss
-    loss_streak = 0
-    max_loss_streak = 0
-    for p in pnl:
-        if p < 0:
-            loss_streak += 1
-            max_loss_streak = max(max_loss_streak, loss_streak)
-        else:
-            loss_streak = 0
+    # Consecutive Loss (แต่ละ streak ได้ group id เดียวกัน -> นับด้วย bincount)
+    is_loss = pnl < 0
+    loss_group = np.cumsum(~is_loss)
+    max_loss_streak = int(np.bincount(loss_group[is_loss]).max(initial=0))
 
     print("\n============== ADVANCED PERFORMANCE REPORT ==============\n")
     print(f"Net Profit          : {net_profit:,.2f}")
@@ -106,28 +125,31 @@ def generate_advanced_report(history: pd.DataFrame, initial_balance: float):
 # PLOT RESULT
 # ------------------------------------------------------
 def plot_result(history: pd.DataFrame):
-    closes = history[history.event == "close"].copy()
-    if closes.empty:
+    closes = history.loc[
+        history["event"] == "close", ["pnl", "dd", "equity"]
+    ].to_numpy(dtype=np.float64)
+    if len(closes) == 0:
         print("[WARN] No trades to plot")
         return
 
-    closes["trade_id"] = range(1, len(closes) + 1)
+    pnl, dd, equity = closes.T
+    trade_id = np.arange(1, len(closes) + 1)
 
     fig, axs = plt.subplots(3, 1, figsize=(13, 11), sharex=True)
 
     # Equity Curve
-    axs[0].plot(closes.trade_id, closes.equity, linewidth=2)
+    axs[0].plot(trade_id, equity, linewidth=2)
     axs[0].set_title("Equity Curve")
     axs[0].grid(True)
 
     # PnL per Trade
-    axs[1].bar(closes.trade_id, closes.pnl)
+    axs[1].bar(trade_id, pnl)
     axs[1].axhline(0)
     axs[1].set_title("PnL per Trade")
     axs[1].grid(True)
 
     # Drawdown
-    axs[2].plot(closes.trade_id, closes.dd)
+    axs[2].plot(trade_id, dd)
     axs[2].set_title("Drawdown (%)")
     axs[2].grid(True)
 
@@ -7,7 +7,6 @@ Role: The Unified Gateway (The Front Gate).
 import yaml
 import os
 from typing import Dict, Any, Optional
-from tensorflow.keras.models import load_model
 
 from Seven.core.seven_observer import SevenObserver
 from Seven.core.seven_auditor import SevenAuditor
@@ -68,10 +67,13 @@ class SevenInterface:
 
     def _boot_brain(self):
         """โหลดโมเดล Seven Brain สำหรับประเมินความมั่นใจ"""
+        model_path = self.settings.get("seven_brain", {}).get("model_path", "Seven/models/seven_brain.h5")
+        if not os.path.exists(model_path):
+            return None  # ไม่มีไฟล์ -> ไม่ต้อง import TensorFlow เลย (Mode Logic-Only)
         try:
-            model_path = self.settings.get("seven_brain", {}).get("model_path", "Seven/models/seven_brain.h5")
-            if os.path.exists(model_path):
-                return load_model(model_path)
+            from tensorflow.keras.models import load_model
+            # compile=False: ใช้แค่ predict ไม่ต้องสร้าง optimizer ใหม่
+            return load_model(model_path, compile=False)
         except Exception:
             pass # เงียบไว้ถ้าโหลดไม่ได้ (Mode Logic-Only)
         return None
@@ -1,8 +1,12 @@
+import os
+import tempfile
 import joblib
+import numpy as np
+from joblib import Parallel, delayed
 from .config_training import PATHS, TIMEFRAMES
 from .config_training import config
 from .dataset_loader import DatasetLoader
-from .feature_set_core import FeatureSetCore
+from .feature_set_core import KERNEL_BACKEND, FeatureSetCore
 from .model_definition import build_model
 from .trainer_v8h import TrainerV8H
 from sklearn.preprocessing import StandardScaler
@@ -10,9 +14,15 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 
 
+def fit_model(model, X, y):
+    model.fit(X, y)
+    return model
+
+
 def run_pipeline():
     # 1) โหลดดาต้า
     loader = DatasetLoader()
+    print(f"Feature kernels: {KERNEL_BACKEND}")
     for tf in TIMEFRAMES:
         print(f"Processing timeframe:{tf}")
         # load raw
@@ -56,20 +66,35 @@ def run_pipeline():
     trainer.train(df_features)
 
     # Scaler Model
+    # float32 ตั้งแต่ต้น -> ครึ่ง bandwidth ตอน fit (ใช้ X_scaled ตัวเดียวกันทั้ง 3 โมเดล)
+    X_np = X.to_numpy(dtype=np.float32, copy=False)
     scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    X_scaled = scaler.fit_transform(X_np)
     joblib.dump(scaler, "models/scaler.pkl")
     print("[OK] scaler.pkl saved")
 
-    # Trend Model
-    trend_model = RandomForestClassifier(n_estimators=200, max_depth=6, random_state=42)
-    trend_model.fit(X_scaled, y_trend)
+    # Trend + Zone Model (fit พร้อมกัน, worker แชร์ X ผ่าน memmap ไม่ต้อง pickle ซ้ำ)
+    # temp dir แยกต่อ run + ลบเสมอแม้ fit error (Windows อาจยังล็อกไฟล์ -> ข้าม error ตอนลบ)
+    with tempfile.TemporaryDirectory(prefix="v8h_", ignore_cleanup_errors=True) as tmp:
+        mmap_path = os.path.join(tmp, "X_scaled.mm")
+        joblib.dump(X_scaled, mmap_path)
+        X_mm = joblib.load(mmap_path, mmap_mode="r")
+        try:
+            trend_model, zone_model = Parallel(n_jobs=2, backend="loky")(
+                delayed(fit_model)(
+                    RandomForestClassifier(
+                        n_estimators=200, max_depth=6, random_state=42, n_jobs=-1
+                    ),
+                    X_mm,
+                    y,
+                )
+                for y in (y_trend, y_zone)
+            )
+        finally:
+            del X_mm
+
     joblib.dump(trend_model, "models/trend_model.pkl")
     print("[OK] trend_model.pkl saved")
-
-    # Zone Model
-    zone_model = RandomForestClassifier(n_estimators=200, max_depth=6, random_state=42)
-    zone_model.fit(X_scaled, y_zone)
     joblib.dump(zone_model, "models/zone_model.pkl")
     print("[OK] zone_model.pkl saved")
 